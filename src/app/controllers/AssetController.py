@@ -2,21 +2,137 @@ from .BaseController import BaseController
 from fastapi import UploadFile
 import os
 import re
+import asyncio
+import multiprocessing
+import secrets
+import sys
+import tempfile
 import aiofiles
 from app.logging import get_logger
+from app.helpers.config import get_settings
 from app.models.db_schemas import Asset
 from app.models import FileTypesEnum
 from langchain_community.document_loaders import TextLoader, PyMuPDFLoader
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from typing import List, Optional
+from typing import List, Optional, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 
 logger = get_logger(__name__)
 
+# Any character that is not a word character or "." is stripped from file names
+FILE_NAME_CLEAN_PATTERN = re.compile(r'[^\w.]')
+SPACE_TO_UNDERSCORE = str.maketrans(" ", "_")
+
+# os.sendfile only copies file to file on Linux, elsewhere the output must be a socket
+SENDFILE_SUPPORTED = sys.platform.startswith("linux")
+
+# Document loader factory for each supported file extension
+FILE_LOADERS = {
+    FileTypesEnum.TXT.value: lambda file_path: TextLoader(file_path, encoding="utf-8"),
+    FileTypesEnum.PDF.value: PyMuPDFLoader,
+}
+
+
+@lru_cache(maxsize=16)
+def get_text_splitter(chunk_size: int, overlap_size: int) -> RecursiveCharacterTextSplitter:
+    """Get the text splitter for a chunk configuration, built once and reused for every document"""
+    # Improved splitter with paragraph and sentence awareness
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=overlap_size,
+        separators=["\n\n", "\n"], # favors paragraphs
+        length_function=len,
+        is_separator_regex=False
+    )
+
+
+# Worker processes for CPU-bound file loading and splitting, created on first use
+_file_processing_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_file_processing_pool() -> ProcessPoolExecutor:
+    """Get the shared process pool used to load and split files"""
+    global _file_processing_pool
+    if _file_processing_pool is None:
+        # Each uvicorn worker has its own pool, so keep it small; never exceed the CPUs this process may use
+        available_cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+        max_workers = max(1, min(get_settings().FILE_PROCESSING_WORKERS, available_cpus))
+        # spawn instead of fork: the parent runs an event loop and DB client threads
+        _file_processing_pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        logger.info(f"File processing pool started with {max_workers} workers")
+    return _file_processing_pool
+
+
+def discard_file_processing_pool(broken_pool: ProcessPoolExecutor) -> None:
+    """Drop a broken file processing pool so the next call starts a fresh one"""
+    global _file_processing_pool
+    # Several calls can see the same broken pool, only the first one replaces it
+    if _file_processing_pool is broken_pool:
+        _file_processing_pool = None
+        broken_pool.shutdown(wait=False, cancel_futures=True)
+        logger.warning("File processing pool broke (a worker died), it will be restarted")
+
+
+def shutdown_file_processing_pool() -> None:
+    """Shut down the shared file processing pool if it was started"""
+    global _file_processing_pool
+    if _file_processing_pool is not None:
+        _file_processing_pool.shutdown(wait=True, cancel_futures=True)
+        _file_processing_pool = None
+        logger.info("File processing pool shut down")
+
+
+def load_and_split_file(
+    file_name: str,
+    file_path: str,
+    chunk_size: int=400,
+    overlap_size: int=20
+) -> Tuple[bool, Optional[List[Document]]]:
+    """Load a file and split it into chunks one document (e.g. PDF page) at a time
+
+    Streaming the loader keeps peak memory at the chunks plus a single page,
+    instead of holding every loaded document alongside its chunks. Module level,
+    so the file processing pool only pickles the arguments, not a controller.
+
+    Args:
+        file_name: The name of the file, used to pick the loader
+        file_path: The full path to the file
+        chunk_size: Size of text chunks in characters
+        overlap_size: Overlap between chunks in characters
+
+    Returns:
+        Tuple[bool, Optional[List[Document]]]: Whether any content was loaded, and the chunks
+    """
+    loader_factory = FILE_LOADERS.get(os.path.splitext(file_name)[-1])
+    if loader_factory is None:
+        logger.error(f"No loader available for file: {file_name}")
+        return False, None
+
+    text_splitter = get_text_splitter(chunk_size, overlap_size)
+    content_loaded = False
+    chunks = []
+    for document in loader_factory(file_path).lazy_load():
+        content_loaded = True
+        chunks.extend(text_splitter.split_documents([document]))
+
+    if not content_loaded:
+        logger.error(f"No content to process for file: {file_name}")
+    return content_loaded, chunks
+
+
 class AssetController(BaseController):
     def __init__(self):
         super().__init__()
         self.size_scale = 1048576  # Convert MB to Bytes
+        self.sendfile_block_size = 1 << 30  # Max bytes per os.sendfile call
+        self.allowed_file_types = frozenset(self.app_settings.FILE_ALLOWED_TYPES)
+        self.max_file_size = self.app_settings.FILE_MAX_SIZE * self.size_scale
 
     def validate_uploaded_file(self, file: UploadFile):
         """
@@ -32,7 +148,7 @@ class AssetController(BaseController):
         Raises:
             ValueError: If the file type is not supported or file size exceeds the limit
         """
-        if file.content_type not in self.app_settings.FILE_ALLOWED_TYPES:
+        if file.content_type not in self.allowed_file_types:
             error_message = f"File type {file.content_type} not supported. Allowed types: {self.app_settings.FILE_ALLOWED_TYPES}"
             logger.warning(f"File validation failed: {error_message}")
             raise ValueError(error_message)
@@ -50,7 +166,7 @@ class AssetController(BaseController):
                 # Assume it's valid and let other validations catch issues
                 file_size = 0
 
-        if file_size > self.app_settings.FILE_MAX_SIZE * self.size_scale:
+        if file_size > self.max_file_size:
             max_size_mb = self.app_settings.FILE_MAX_SIZE
             error_message = f"File size ({file_size / self.size_scale:.2f} MB) exceeds maximum allowed size ({max_size_mb} MB)"
             logger.warning(f"File validation failed: {error_message}")
@@ -58,46 +174,97 @@ class AssetController(BaseController):
 
         return True
 
-    def generate_unique_filepath(self, project_path: str, original_file_name: str):
-        """Generate a unique file path for an asset in a project directory"""
-        random_key = self.generate_random_string()
-        cleaned_file_name = self.get_clean_file_name(orig_file_name=original_file_name)
-        new_file_name = random_key + "_" + cleaned_file_name
+    def create_unique_file(self, project_path: str, original_file_name: str) -> Tuple[int, str, str]:
+        """Atomically create a new, uniquely named asset file in a project directory
 
-        new_file_path = os.path.join(
-            project_path, new_file_name
-        )
+        The file is created with O_CREAT | O_EXCL, so the existence check and the
+        creation are a single syscall and parallel uploads can never pick the same name.
 
-        while os.path.exists(new_file_path):
-            random_key = self.generate_random_string()
-            new_file_name = random_key + "_" + cleaned_file_name
-            new_file_path = os.path.join(
-                project_path, new_file_name
-            )
+        Args:
+            project_path: Directory the asset file is created in
+            original_file_name: The name of the uploaded file
+
+        Returns:
+            Tuple[int, str, str]: Open write-only file descriptor, file path and file name
+        """
+        cleaned_file_name = self.get_clean_file_name(orig_file_name=original_file_name)
+        flags = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0)
 
-        return new_file_path, new_file_name
+        while True:
+            new_file_name = secrets.token_urlsafe(9) + "_" + cleaned_file_name
+            new_file_path = os.path.join(project_path, new_file_name)
+            try:
+                fd = os.open(new_file_path, flags, 0o666)
+                return fd, new_file_path, new_file_name
+            except FileExistsError:
+                continue
 
     def get_clean_file_name(self, orig_file_name: str):
         """Clean a file name by removing special characters"""
-        # remove any special characters except underscore and .
-        cleaned_file_name = re.sub(r'[^\w.]', '', orig_file_name.strip())
+        # replace spaces with underscore, then remove any special characters except underscore and .
+        cleaned_file_name = orig_file_name.strip().translate(SPACE_TO_UNDERSCORE)
+        return FILE_NAME_CLEAN_PATTERN.sub('', cleaned_file_name)
+
+    def get_upload_fileno(self, file: UploadFile) -> Optional[int]:
+        """Get the OS file descriptor backing an upload, or None if it only lives in memory"""
+        upload_file = file.file
+
+        # SpooledTemporaryFile.fileno() forces a rollover to disk, only use it once already rolled.
+        # There is no public rollover flag, so this reads CPython's long-standing _rolled attribute;
+        # should it ever disappear, the upload is treated as in memory and takes the chunked copy.
+        if isinstance(upload_file, tempfile.SpooledTemporaryFile) and not getattr(upload_file, "_rolled", False):
+            return None
 
-        # replace spaces with underscore
-        cleaned_file_name = cleaned_file_name.replace(" ", "_")
+        try:
+            return upload_file.fileno()
+        except Exception:
+            return None
 
-        return cleaned_file_name
+    def copy_file_with_sendfile(self, src_fd: int, src_offset: int, destination: Union[str, int]) -> None:
+        """Copy a file descriptor's content into destination (path or fd) using kernel-side os.sendfile
 
-    async def save_uploaded_file(self, file: UploadFile, file_path: str, chunk_size: int):
-        """Save an uploaded file to the specified path"""
-        try:
-            # Opens the destination file asynchronously
-            async with aiofiles.open(file=file_path, mode="wb") as f:
-                # Reads the uploaded file in chunks
-                while chunk := await file.read(chunk_size):
-                    # write the chunk in the destination file f
-                    await f.write(chunk)
+        A destination fd is left open, it stays owned by the caller.
+        """
+        with open(destination, "wb", closefd=not isinstance(destination, int)) as f:
+            offset = src_offset
+            while sent := os.sendfile(f.fileno(), src_fd, offset, self.sendfile_block_size):
+                offset += sent
 
-            return True
+    async def save_uploaded_file(self, file: UploadFile, file_path: str, chunk_size: int = 1048576,
+                                 file_fd: Optional[int] = None):
+        """Save an uploaded file to the specified path, writing through file_fd when it is already open
+
+        file_fd is owned by this method and is always closed before it returns.
+        """
+        destination = file_fd if file_fd is not None else file_path
+        try:
+            try:
+                # Fast path: disk-backed upload, copy it in the kernel without passing through userspace
+                src_fd = self.get_upload_fileno(file) if SENDFILE_SUPPORTED else None
+                if src_fd is not None:
+                    try:
+                        await asyncio.to_thread(
+                            self.copy_file_with_sendfile, src_fd, file.file.tell(), destination
+                        )
+                        return True
+                    except OSError as e:
+                        # sendfile does not move the upload's position, only the partial output needs discarding
+                        logger.warning(f"sendfile copy failed, falling back to a chunked copy: {e}")
+                        if file_fd is not None:
+                            os.lseek(file_fd, 0, os.SEEK_SET)
+                            os.ftruncate(file_fd, 0)
+
+                # Opens the destination file asynchronously
+                async with aiofiles.open(file=destination, mode="wb", closefd=file_fd is None) as f:
+                    # Reads the uploaded file in chunks
+                    while chunk := await file.read(chunk_size):
+                        # write the chunk in the destination file f
+                        await f.write(chunk)
+
+                return True
+            finally:
+                if file_fd is not None:
+                    os.close(file_fd)
         except Exception as e:
             logger.error(f"Error while uploading file: {e}")
 
@@ -112,15 +279,14 @@ class AssetController(BaseController):
 
     def delete_asset_file(self, file_path: str) -> bool:
         """Delete an asset file from the file system"""
-        if not os.path.exists(file_path):
-            logger.warning(f"Asset file not found during deletion: {file_path}")
-            return False
-
         try:
             os.remove(file_path)
             logger.info(f"Successfully deleted asset file: {file_path}")
             return True
-        except Exception as e:
+        except FileNotFoundError:
+            logger.warning(f"Asset file not found during deletion: {file_path}")
+            return False
+        except OSError as e:
             logger.error(f"Error deleting asset file '{file_path}': {e}")
             return False
 
@@ -132,60 +298,32 @@ class AssetController(BaseController):
         """Get the full path to a file in a project directory"""
         return os.path.join(project_path, file_name)
 
-    def get_file_loader(self, file_name: str, file_path: str):
-        """Get the appropriate document loader for a file based on its extension"""
-        file_extension = self.get_file_extension(file_name=file_name)
-
-        if file_extension == FileTypesEnum.TXT.value:
-            return TextLoader(file_path, encoding="utf-8")
-
-        if file_extension == FileTypesEnum.PDF.value:
-            return PyMuPDFLoader(file_path)
-
-        return None
-
-    def get_file_content(self, file_name: str, file_path: str) -> List[Document]:
-        """Load the content of a file as a list of documents"""
-        loader = self.get_file_loader(file_name=file_name, file_path=file_path)
-        if loader is None:
-            logger.error(f"No loader available for file: {file_name}")
-            return None
-        return loader.load()
-
-    def process_file_content(
+    async def load_and_split_file_in_pool(
         self,
-        file_content: List[Document],
         file_name: str,
+        file_path: str,
         chunk_size: int=400,
         overlap_size: int=20
-    ) -> List[Document]:
-        """Process file content into chunks"""
-        if not file_content:
-            logger.error(f"No content to process for file: {file_name}")
-            return None
-
-        file_content_texts = [
-            document.page_content
-            for document in file_content
-        ]
-
-        file_content_metadatas = [
-            document.metadata
-            for document in file_content
-        ]
-
-        # Improved splitter with paragraph and sentence awareness
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=overlap_size,
-            separators=["\n\n", "\n"], # favors paragraphs
-            length_function=len,
-            is_separator_regex=False
-        )
-
-        chunks = text_splitter.create_documents(
-            file_content_texts,
-            metadatas=file_content_metadatas
-        )
+    ) -> Tuple[bool, Optional[List[Document]]]:
+        """Run load_and_split_file in the file processing pool, off the event loop
 
-        return chunks
+        A worker crash (e.g. out of memory on a large PDF) breaks the whole pool,
+        so the pool is replaced and the file is retried once.
+        """
+        loop = asyncio.get_running_loop()
+        for attempt in range(2):
+            pool = get_file_processing_pool()
+            try:
+                return await loop.run_in_executor(
+                    pool,
+                    load_and_split_file,
+                    file_name,
+                    file_path,
+                    chunk_size,
+                    overlap_size
+                )
+            except BrokenProcessPool:
+                discard_file_processing_pool(pool)
+                if attempt:
+                    raise
+                logger.warning(f"Retrying processing of file {file_name} in a new file processing pool")
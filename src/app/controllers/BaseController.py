@@ -1,7 +1,5 @@
 from app.helpers.config import get_settings, Settings
 import os
-import random
-import string
 
 class BaseController:
     def __init__(self) -> None:
@@ -16,10 +14,6 @@ class BaseController:
         )
         
         
-    def generate_random_string(self, length: int=12) -> str:
-        return ''.join(random.choices(string.ascii_lowercase + string.digits, k=length))
-    
-    
     def get_database_path(self, db_name: str):
 
         database_path = os.path.join(
@@ -1,25 +1,40 @@
 from .BaseController import BaseController
 from .NLPController import NLPController
+import asyncio
 import os
 import shutil
-import threading
+import stat
 import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
 from app.logging import get_logger
 from app.models.db_schemas import KnowledgeBase
 
 logger = get_logger(__name__)
 
+# Knowledge base ID -> directory path for directories this process has already ensured exist.
+# The cache lives at module level, not on the controller, because the directories are per process:
+# the startup warmup and any other controller instance share it. Knowledge base IDs are never
+# reused, so an entry left stale by a deletion in another worker is never looked up.
+_knowledge_base_dir_paths: dict[str, str] = {}
+
+# Bounded pool for blocking directory work, so a burst of deletes cannot thrash the disk
+_file_system_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="kb-fs")
+
 class KnowledgeBaseController(BaseController):
     def __init__(self):
         super().__init__()
-        # Dictionary to store locks for directory creation
-        self._dir_locks = {}
+
+    def _build_knowledge_base_path(self, knowledge_base_id: str) -> str:
+        """Build the directory path of a knowledge base, the only place it is joined"""
+        # Use knowledge base ID for directory name to ensure uniqueness
+        return os.path.join(self.files_dir, knowledge_base_id)
 
     def get_knowledge_base_path(self, knowledge_base_id: str):
         """Get or create a knowledge base directory path using knowledge base ID
 
-        Uses a locking mechanism to prevent race conditions when multiple requests
-        try to create the same directory simultaneously.
+        Relies on os.mkdir being atomic: when several requests create the same
+        directory simultaneously, exactly one succeeds and the rest get FileExistsError.
 
         Args:
             knowledge_base_id: The ID of the knowledge base
@@ -27,52 +42,83 @@ class KnowledgeBaseController(BaseController):
         Returns:
             str: The path to the knowledge base directory
         """
-        # Use knowledge base ID for directory name to ensure uniqueness
-        knowledge_base_dir_path = os.path.join(self.files_dir, knowledge_base_id)
-
-        # Get or create a lock for this knowledge base ID
-        if knowledge_base_id not in self._dir_locks:
-            self._dir_locks[knowledge_base_id] = threading.Lock()
-
-        # Acquire the lock before checking/creating the directory
-        with self._dir_locks[knowledge_base_id]:
-            if not os.path.exists(knowledge_base_dir_path):
-                try:
-                    os.mkdir(knowledge_base_dir_path)
-                    logger.info(f"Created knowledge base directory: {knowledge_base_dir_path}")
-                except Exception as e:
-                    logger.error(f"Error creating knowledge base directory '{knowledge_base_dir_path}': {e}")
-                    # If another process created the directory between our check and mkdir
-                    if not os.path.exists(knowledge_base_dir_path):
-                        raise
+        knowledge_base_dir_path = _knowledge_base_dir_paths.get(knowledge_base_id)
+        if knowledge_base_dir_path is not None:
+            return knowledge_base_dir_path
+
+        knowledge_base_dir_path = self._build_knowledge_base_path(knowledge_base_id)
 
+        try:
+            os.mkdir(knowledge_base_dir_path)
+            logger.info("Created knowledge base directory: %s", knowledge_base_dir_path)
+        except FileExistsError:
+            pass
+        except OSError as e:
+            logger.error("Error creating knowledge base directory '%s': %s", knowledge_base_dir_path, e)
+            raise
+
+        _knowledge_base_dir_paths[knowledge_base_id] = knowledge_base_dir_path
         return knowledge_base_dir_path
 
 
+    def warmup_knowledge_base_dirs(self, knowledge_base_ids: Iterable[str]) -> int:
+        """Ensure the directories of existing knowledge bases exist ahead of the first request
+
+        Meant to run once at startup, off the event loop. Every directory ends up in the
+        path cache, so get_knowledge_base_path never has to mkdir on the request path.
+
+        Args:
+            knowledge_base_ids: The IDs of the knowledge bases to prepare
+
+        Returns:
+            int: The number of knowledge base directories prepared
+        """
+        prepared_count = 0
+        for knowledge_base_id in knowledge_base_ids:
+            try:
+                self.get_knowledge_base_path(knowledge_base_id=knowledge_base_id)
+                prepared_count += 1
+            except OSError:
+                # Already logged by get_knowledge_base_path, it is retried lazily on first use
+                continue
+
+        logger.info("Prepared %s knowledge base directories", prepared_count)
+        return prepared_count
+
+
     def find_knowledge_base_path(self, knowledge_base_id: str):
         """Find an existing knowledge base directory path using knowledge base ID"""
-        knowledge_base_dir_path = os.path.join(self.files_dir, knowledge_base_id)
+        knowledge_base_dir_path = _knowledge_base_dir_paths.get(knowledge_base_id)
+        if knowledge_base_dir_path is not None:
+            return knowledge_base_dir_path
+
+        knowledge_base_dir_path = self._build_knowledge_base_path(knowledge_base_id)
 
-        if not os.path.exists(knowledge_base_dir_path):
+        # One stat call that also rejects a stray file with the knowledge base's name
+        try:
+            if not stat.S_ISDIR(os.stat(knowledge_base_dir_path).st_mode):
+                return None
+        except FileNotFoundError:
             return None
 
+        _knowledge_base_dir_paths[knowledge_base_id] = knowledge_base_dir_path
         return knowledge_base_dir_path
 
 
     def delete_knowledge_base_directory(self, knowledge_base_id: str) -> bool:
         """Delete a knowledge base directory and all its contents using knowledge base ID"""
-        knowledge_base_dir_path = self.find_knowledge_base_path(knowledge_base_id)
-
-        if knowledge_base_dir_path is None:
-            logger.warning(f"Knowledge base directory for ID '{knowledge_base_id}' not found during deletion")
-            return False
+        _knowledge_base_dir_paths.pop(knowledge_base_id, None)
+        knowledge_base_dir_path = self._build_knowledge_base_path(knowledge_base_id)
 
         try:
             shutil.rmtree(knowledge_base_dir_path)
-            logger.info(f"Successfully deleted knowledge base directory: {knowledge_base_dir_path}")
+            logger.info("Successfully deleted knowledge base directory: %s", knowledge_base_dir_path)
             return True
-        except Exception as e:
-            logger.error(f"Error deleting knowledge base directory '{knowledge_base_dir_path}': {e}")
+        except FileNotFoundError:
+            logger.warning("Knowledge base directory for ID '%s' not found during deletion", knowledge_base_id)
+            return False
+        except OSError as e:
+            logger.error("Error deleting knowledge base directory '%s': %s", knowledge_base_dir_path, e)
             return False
 
 
@@ -92,19 +138,29 @@ class KnowledgeBaseController(BaseController):
             "overall_success": False
         }
 
-        # Delete the knowledge base's vector database collection
-        try:
-            result["vector_db_deleted"] = await nlp_controller.delete_vector_db_collection(knowledge_base=knowledge_base)
-            if not result["vector_db_deleted"]:
-                logger.warning(f"Failed to delete vector database collection for knowledge base ID: {knowledge_base.id}")
-            else:
-                logger.info(f"Successfully deleted vector database collection for knowledge base ID: {knowledge_base.id}")
-        except Exception as e:
-            logger.error(f"Error deleting vector database collection for knowledge base ID '{knowledge_base.id}': {e}")
-            result["vector_db_deleted"] = False
-
-        # Delete the knowledge base directory
-        result["directory_deleted"] = self.delete_knowledge_base_directory(knowledge_base_id=str(knowledge_base.id))
+        # The vector database collection and the directory are independent, delete them concurrently.
+        # rmtree is blocking file system work, so it runs in the bounded file system pool.
+        vector_db_result, directory_result = await asyncio.gather(
+            nlp_controller.delete_vector_db_collection(knowledge_base=knowledge_base),
+            asyncio.get_running_loop().run_in_executor(
+                _file_system_executor, self.delete_knowledge_base_directory, str(knowledge_base.id)
+            ),
+            return_exceptions=True
+        )
+
+        # Check the knowledge base's vector database collection deletion
+        if isinstance(vector_db_result, Exception):
+            logger.error("Error deleting vector database collection for knowledge base ID '%s': %s", knowledge_base.id, vector_db_result)
+        elif not vector_db_result:
+            logger.warning("Failed to delete vector database collection for knowledge base ID: %s", knowledge_base.id)
+        else:
+            logger.info("Successfully deleted vector database collection for knowledge base ID: %s", knowledge_base.id)
+        result["vector_db_deleted"] = vector_db_result is True
+
+        # Check the knowledge base directory deletion
+        if isinstance(directory_result, Exception):
+            logger.error("Error deleting knowledge base directory for ID '%s': %s", knowledge_base.id, directory_result)
+        result["directory_deleted"] = directory_result is True
 
         # Set overall success flag
         result["overall_success"] = result["vector_db_deleted"] and result["directory_deleted"]
@@ -112,7 +168,7 @@ class KnowledgeBaseController(BaseController):
         return result
 
 
-    async def update_knowledge_base_resources(self, knowledge_base: KnowledgeBase, new_knowledge_base_name: str, nlp_controller: NLPController) -> bool:
+    def update_knowledge_base_resources(self, knowledge_base: KnowledgeBase, new_knowledge_base_name: str, nlp_controller: NLPController) -> bool:
         """Update external resources when a knowledge base is updated (currently a placeholder for future extensions)
 
         Args:
@@ -124,12 +180,14 @@ class KnowledgeBaseController(BaseController):
             bool: True if the update was successful, False otherwise
         """
         # Log the update operation
-        logger.info(f"Updating knowledge base resources for {knowledge_base.id} (new name: {new_knowledge_base_name})")
+        logger.info("Updating knowledge base resources for %s (new name: %s)", knowledge_base.id, new_knowledge_base_name)
 
         # Currently, there are no vector database operations needed when updating a knowledge base name
         # This method is included for future extensions, such as if we need to update collection metadata
         # or perform other operations when a knowledge base is renamed
 
+        # Kept synchronous while there is nothing to await; make it async again once
+        # real vector database work is added here.
         # For example, in the future we might want to update metadata in the vector database:
         # if nlp_controller and hasattr(nlp_controller, 'update_collection_metadata'):
         #     try:
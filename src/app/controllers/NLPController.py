@@ -3,12 +3,60 @@ from app.stores.vectordb import VectorDBProviderInterface
 from app.stores.llm import LLMProviderInterface
 from app.stores.llm.LLMEnums import DocumentTypeEnum
 from app.models.db_schemas import KnowledgeBase, DataChunk, Asset
-from typing import List, Optional
-import json
+from app.utils.cache_utils import TTLCache
+from typing import Any, List, Optional
+from enum import Enum
+from functools import lru_cache
+from array import array
+import asyncio
+import re
 from app.logging import get_logger
 
 logger = get_logger(__name__)
 
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+# Number of chunks embedded and inserted together when indexing
+INDEXING_BATCH_SIZE = 256
+
+# NLPController is created per request, so the caches are shared at module level.
+# Normalized query -> query embedding vector, packed as float32 (4 bytes per dimension
+# instead of a list of 24-byte Python floats)
+_query_embedding_cache = TTLCache(maxsize=2000, ttl=600)
+# (collection name, normalized query, limit) -> retrieved documents, dropped whenever the collection changes.
+# The cache is per process: with several uvicorn workers, only the worker that changed a collection
+# drops its entries, the others can serve deleted or replaced content until the TTL expires.
+_search_results_cache = TTLCache(maxsize=1000, ttl=300)
+# Collection name -> number of invalidations, a search only caches its results if no invalidation
+# happened while it ran, so a search racing a deletion cannot re-cache the deleted content
+_search_results_generations: dict[str, int] = {}
+
+# Number of results returned when a search does not specify a limit
+DEFAULT_SEARCH_LIMIT = 10
+
+# Number of results fetched speculatively by a prefetching search, so follow-up
+# searches for the same query with any smaller limit are served from the cache
+PREFETCH_LIMIT = 64
+
+@lru_cache(maxsize=1024)
+def build_collection_name(knowledge_base_id: str) -> str:
+    """Build the vector database collection name of a knowledge base, reusing recent results"""
+    return f"kb_collection_{knowledge_base_id}".strip()
+
+
+def to_plain_data(obj: Any) -> Any:
+    """Recursively convert an object graph into plain dicts, lists and scalars in a single pass"""
+    if isinstance(obj, Enum):
+        return to_plain_data(obj.value)
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    if isinstance(obj, dict):
+        return {key: to_plain_data(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [to_plain_data(value) for value in obj]
+    return to_plain_data(vars(obj))
+
+
 class NLPController(BaseController):
     def __init__(self, vectordb_client: VectorDBProviderInterface,
                  generation_client: LLMProviderInterface,
@@ -21,7 +69,12 @@ class NLPController(BaseController):
 
     def create_collection_name(self, knowledge_base_id: str):
         """Create a collection name using knowledge base ID"""
-        return f"kb_collection_{knowledge_base_id}".strip()
+        return build_collection_name(knowledge_base_id)
+
+    def invalidate_search_results(self, collection_name: str) -> None:
+        """Drop cached search results of a collection after its content changed"""
+        _search_results_generations[collection_name] = _search_results_generations.get(collection_name, 0) + 1
+        _search_results_cache.discard_where(lambda key: key[0] == collection_name)
 
     async def list_vector_db_collections(self) -> List:
         return await self.vectordb_client.list_all_collections()
@@ -39,9 +92,7 @@ class NLPController(BaseController):
         if not collection_info:
             return None
 
-        return json.loads(
-            json.dumps(collection_info, default = lambda x: x.__dict__)
-        )
+        return to_plain_data(collection_info)
 
     async def create_vector_db_collection(self, knowledge_base: KnowledgeBase, do_reset: bool = False) -> tuple[bool, str, str | None]:
         """Create a vector database collection for a knowledge base
@@ -59,11 +110,16 @@ class NLPController(BaseController):
         collection_name = self.create_collection_name(knowledge_base_id=str(knowledge_base.id))
 
         try:
-            is_created = await self.vectordb_client.create_collection(
-                collection_name = collection_name,
-                embedding_size = self.embedding_client.embedding_size,
-                do_reset = do_reset
-            )
+            try:
+                is_created = await self.vectordb_client.create_collection(
+                    collection_name = collection_name,
+                    embedding_size = self.embedding_client.embedding_size,
+                    do_reset = do_reset
+                )
+            finally:
+                # After the reset, so searches that ran while it was in flight cannot re-cache old results
+                if do_reset:
+                    self.invalidate_search_results(collection_name)
 
             if not is_created:
                 return False, f"Failed to create vector database collection '{collection_name}'.", None
@@ -76,7 +132,11 @@ class NLPController(BaseController):
     async def delete_vector_db_collection(self, knowledge_base: KnowledgeBase) -> bool:
         """Delete a vector database collection for a knowledge base"""
         collection_name = self.create_collection_name(knowledge_base_id=str(knowledge_base.id))
-        return await self.vectordb_client.delete_collection(collection_name=collection_name)
+        try:
+            return await self.vectordb_client.delete_collection(collection_name=collection_name)
+        finally:
+            # After the deletion, so searches that ran while it was in flight cannot re-cache old results
+            self.invalidate_search_results(collection_name)
 
     async def delete_asset_from_vector_db(self, knowledge_base: KnowledgeBase, asset: Asset) -> bool:
         """Delete a specific asset's data from the vector database
@@ -97,14 +157,19 @@ class NLPController(BaseController):
 
         # Delete records with matching asset_id in metadata
         asset_id_str = str(asset.id)
-        return await self.vectordb_client.delete_by_metadata(collection_name=collection_name, filter_dict={"asset_id": asset_id_str})
+        try:
+            return await self.vectordb_client.delete_by_metadata(collection_name=collection_name, filter_dict={"asset_id": asset_id_str})
+        finally:
+            # After the deletion, so searches that ran while it was in flight cannot re-cache old results
+            self.invalidate_search_results(collection_name)
 
     async def index_into_vector_db(
         self,
         collection_name: str,
         chunks: List[DataChunk],
         chunks_ids: List[int],
-        skip_duplicates: bool = False
+        skip_duplicates: bool = False,
+        pending_reset: Optional[asyncio.Task] = None
         ) -> bool:
         """Index chunks into the vector database
 
@@ -113,6 +178,14 @@ class NLPController(BaseController):
             chunks: List of data chunks to index
             chunks_ids: List of chunk IDs
             skip_duplicates: Whether to skip chunks that already exist in the vector database
+            pending_reset: In-flight deletion of the chunks being replaced. It runs while the
+                embeddings are generated and is awaited before inserting (or before the
+                duplicate check, which must not see records that are being deleted)
+
+        Batches are inserted as they are embedded, so on failure the batches before the
+        failing one stay in the collection. Points are upserted under their chunk IDs, so
+        retrying the same chunks overwrites them; index_asset_into_vector_db removes them
+        instead when it has reset the asset.
 
         Returns:
             bool: True if indexing was successful, False otherwise
@@ -124,20 +197,22 @@ class NLPController(BaseController):
             filtered_chunks_ids = []
             skipped_count = 0
 
-            # Prepare all chunks with their metadata
-            all_chunks_with_metadata = []
-            for i, chunk in enumerate(chunks):
-                chunk_id = chunks_ids[i]
-                metadata = chunk.chunk_metadata.copy() if chunk.chunk_metadata else {}
-                # Add asset_id and knowledge_base_id to metadata if not already present
-                metadata["asset_id"] = str(chunk.chunk_asset_id)
-                metadata["knowledge_base_id"] = str(chunk.chunk_knowledge_base_id)
-                metadata["chunk_order"] = chunk.chunk_order
-
-                all_chunks_with_metadata.append((chunk, chunk_id, metadata))
+            # Prepare all chunks with their metadata, adding asset_id, knowledge_base_id and chunk_order
+            all_chunks_with_metadata = [
+                (chunk, chunk_id, {
+                    **(chunk.chunk_metadata or {}),
+                    "asset_id": str(chunk.chunk_asset_id),
+                    "knowledge_base_id": str(chunk.chunk_knowledge_base_id),
+                    "chunk_order": chunk.chunk_order
+                })
+                for chunk, chunk_id in zip(chunks, chunks_ids)
+            ]
 
             # If skip_duplicates, perform batch duplicate checking
             if skip_duplicates and all_chunks_with_metadata:
+                if pending_reset is not None:
+                    await pending_reset
+
                 # Prepare filter dictionaries for batch search
                 filter_dicts = []
                 for _, _, metadata in all_chunks_with_metadata:
@@ -154,7 +229,7 @@ class NLPController(BaseController):
 
                 # Process each chunk based on duplicate check results
                 for i, (chunk, chunk_id, metadata) in enumerate(all_chunks_with_metadata):
-                    filter_key = f"asset_id:{metadata['asset_id']}_chunk_order:{metadata['chunk_order']}"
+                    filter_key = (("asset_id", metadata["asset_id"]), ("chunk_order", metadata["chunk_order"]))
 
                     # Check if this chunk already exists
                     existing = duplicate_results.get(filter_key, [])
@@ -169,39 +244,61 @@ class NLPController(BaseController):
                     filtered_chunks_ids.append(chunk_id)
             else:
                 # No duplicate checking, process all chunks
-                for chunk, chunk_id, metadata in all_chunks_with_metadata:
-                    texts.append(chunk.chunk_text)
-                    metadatas.append(metadata)
-                    filtered_chunks_ids.append(chunk_id)
+                texts = [chunk.chunk_text for chunk, _, _ in all_chunks_with_metadata]
+                metadatas = [metadata for _, _, metadata in all_chunks_with_metadata]
+                filtered_chunks_ids = [chunk_id for _, chunk_id, _ in all_chunks_with_metadata]
 
             # If no chunks to process after filtering, return success
             if not texts:
                 logger.info(f"No new chunks to index. Skipped {skipped_count} existing chunks.")
                 return True
 
-            # Generate embeddings for each text
+            # Embed and insert in sub-batches so only one batch of vectors is resident at a time.
+            # Each batch's insert runs while the next batch is being embedded.
+            pending_insert = None
             try:
-                vectors = self.embedding_client.embed_text(
-                    text=texts,
-                    document_type=DocumentTypeEnum.DOCUMENT.value
-                )
-                # Check if embeddings were generated successfully
-                if not vectors or len(vectors) == 0:
-                    logger.error("Failed to generate embeddings for chunks")
-                    return False
-
-            except Exception as e:
-                logger.error(f"Error generating embeddings: {str(e)}")
-                return False
-
-            # Insert data chunks into vector database
-            is_inserted = await self.vectordb_client.insert_many(
-                collection_name=collection_name,
-                texts=texts,
-                metadatas=metadatas,
-                vectors=vectors,
-                record_ids=filtered_chunks_ids
-            )
+                for batch_start in range(0, len(texts), INDEXING_BATCH_SIZE):
+                    batch_end = batch_start + INDEXING_BATCH_SIZE
+                    batch_texts = texts[batch_start:batch_end]
+
+                    # Generate embeddings in a worker thread so the event loop (and a pending reset) can progress
+                    try:
+                        vectors = await asyncio.to_thread(
+                            self.embedding_client.embed_text,
+                            text=batch_texts,
+                            document_type=DocumentTypeEnum.DOCUMENT.value
+                        )
+                        # Check if embeddings were generated successfully
+                        if not vectors or len(vectors) == 0:
+                            logger.error("Failed to generate embeddings for chunks")
+                            return False
+
+                    except Exception as e:
+                        logger.error(f"Error generating embeddings: {str(e)}")
+                        return False
+
+                    if pending_reset is not None:
+                        await pending_reset
+
+                    if pending_insert is not None and not await pending_insert:
+                        logger.error(f"Failed to insert chunks into vector database collection '{collection_name}'")
+                        return False
+
+                    # Insert data chunks into vector database
+                    pending_insert = asyncio.create_task(self.vectordb_client.insert_many(
+                        collection_name=collection_name,
+                        texts=batch_texts,
+                        metadatas=metadatas[batch_start:batch_end],
+                        vectors=vectors,
+                        record_ids=filtered_chunks_ids[batch_start:batch_end]
+                    ))
+
+                is_inserted = await pending_insert
+            finally:
+                # On an early return, let the in-flight insert finish rather than abandon it
+                if pending_insert is not None and not pending_insert.done():
+                    await asyncio.gather(pending_insert, return_exceptions=True)
+                self.invalidate_search_results(collection_name)
 
             if not is_inserted:
                 logger.error(f"Failed to insert chunks into vector database collection '{collection_name}'")
@@ -214,6 +311,19 @@ class NLPController(BaseController):
             logger.error(f"Error indexing chunks into vector database: {str(e)}")
             return False
 
+    async def reset_asset_in_vector_db(self, collection_name: str, asset_id: str) -> bool:
+        """Delete an asset's existing chunks from a collection before it is re-indexed"""
+        logger.info(f"Resetting asset {asset_id} in collection {collection_name} (deleting existing chunks only)")
+        deleted = await self.vectordb_client.delete_by_metadata(
+            collection_name=collection_name,
+            filter_dict={"asset_id": asset_id}
+        )
+        if not deleted:
+            logger.warning(f"Failed to delete existing chunks for asset {asset_id} during reset")
+        else:
+            logger.info(f"Successfully deleted existing chunks for asset {asset_id}")
+        return deleted
+
     async def index_asset_into_vector_db(self, knowledge_base: KnowledgeBase, asset: Asset, chunks: List[DataChunk], chunks_ids: List[int], do_reset: bool = True, skip_duplicates: bool = False) -> tuple[bool, str]:
         """Index a specific asset's chunks into the vector database
 
@@ -230,6 +340,7 @@ class NLPController(BaseController):
                 - success: True if indexing was successful, False otherwise
                 - error_message: Empty string if successful, error details if failed
         """
+        asset_id_str = str(asset.id)
         try:
             # Get or create collection
             collection_name = self.create_collection_name(knowledge_base_id=str(knowledge_base.id))
@@ -245,88 +356,140 @@ class NLPController(BaseController):
                 if not success:
                     return False, f"Failed to create collection: {error_msg}"
 
-                collection_name = self.create_collection_name(knowledge_base_id=str(knowledge_base.id))
-
-            # Delete existing chunks for this asset if do_reset is True
-            asset_id_str = str(asset.id)
+            # Delete existing chunks for this asset if do_reset is True,
+            # overlapping the deletion with the embedding of the new chunks
+            reset_task = None
             if do_reset:
-                logger.info(f"Resetting asset {asset_id_str} in collection {collection_name} (deleting existing chunks only)")
-                deleted = await self.vectordb_client.delete_by_metadata(
+                self.invalidate_search_results(collection_name)
+                reset_task = asyncio.create_task(
+                    self.reset_asset_in_vector_db(collection_name=collection_name, asset_id=asset_id_str)
+                )
+
+            try:
+                # Index the chunks
+                if not chunks or len(chunks) == 0:
+                    return True, ""  # No chunks to index, consider it a success
+
+                indexed = await self.index_into_vector_db(
                     collection_name=collection_name,
-                    filter_dict={"asset_id": asset_id_str}
+                    chunks=chunks,
+                    chunks_ids=chunks_ids,
+                    skip_duplicates=skip_duplicates,
+                    pending_reset=reset_task
                 )
-                if not deleted:
-                    logger.warning(f"Failed to delete existing chunks for asset {asset_id_str} during reset")
-                else:
-                    logger.info(f"Successfully deleted existing chunks for asset {asset_id_str}")
-
-            # Index the chunks
-            if not chunks or len(chunks) == 0:
-                return True, ""  # No chunks to index, consider it a success
-
-            indexed = await self.index_into_vector_db(
-                collection_name=collection_name,
-                chunks=chunks,
-                chunks_ids=chunks_ids,
-                skip_duplicates=skip_duplicates
-            )
+            finally:
+                # Never leave the reset running past this call, even on early return or error
+                if reset_task is not None:
+                    await reset_task
+                    # Searches that ran while the deletion was in flight may have cached the old chunks
+                    self.invalidate_search_results(collection_name)
 
             if not indexed:
+                if do_reset:
+                    # The old chunks are already gone, drop the batches inserted before the failure
+                    # too rather than leave the asset half indexed
+                    await self.reset_asset_in_vector_db(collection_name=collection_name, asset_id=asset_id_str)
+                    self.invalidate_search_results(collection_name)
                 return False, f"Failed to index chunks for asset {asset_id_str}"
 
             return True, ""
         except Exception as e:
-            error_msg = f"Error indexing asset {str(asset.id)}: {str(e)}"
+            error_msg = f"Error indexing asset {asset_id_str}: {str(e)}"
             logger.error(error_msg)
             return False, error_msg
 
+    async def embed_query(self, normalized_query: str) -> Optional[List[float]]:
+        """Embed a normalized search query, going to the embedding provider only on a cache miss
+
+        Args:
+            normalized_query: The query with whitespace already collapsed
+
+        Returns:
+            The query embedding vector, or None if embedding failed
+        """
+        packed_vector = _query_embedding_cache.get(normalized_query)
+        if packed_vector is not None:
+            return packed_vector.tolist()
+
+        # Batch of one: providers iterate over the text argument, a bare string would be split per character
+        vectors = await asyncio.to_thread(
+            self.embedding_client.embed_text,
+            text=[normalized_query],
+            document_type=DocumentTypeEnum.QUERY.value
+        )
+        if not vectors or not vectors[0]:
+            return None
+
+        query_vector = vectors[0]
+        _query_embedding_cache.set(normalized_query, array("f", query_vector))
+        return query_vector
+
     async def search_vector_db(
         self,
         knowledge_base: KnowledgeBase,
         query: str,
-        limit: int = 10
+        limit: Optional[int] = DEFAULT_SEARCH_LIMIT,
+        prefetch: bool = False
         ):
-        """Search a knowledge base's vector database collection"""
+        """Search a knowledge base's vector database collection
+
+        Query embeddings and retrieved documents are cached, so a repeated query skips
+        both the embedding call and the vector database call. A prefetching search fetches
+        PREFETCH_LIMIT results up front, so a follow-up search for the same query with
+        a smaller limit is sliced from the cache.
+
+        Args:
+            knowledge_base: The knowledge base to search
+            query: The search query text
+            limit: Maximum number of results to return, DEFAULT_SEARCH_LIMIT when None
+            prefetch: Whether to speculatively fetch PREFETCH_LIMIT results instead of limit
+
+        Returns:
+            The retrieved documents, or None if the search could not be performed
+
+        Raises:
+            ValueError: If limit is not a positive number
+        """
+        if limit is None:
+            limit = DEFAULT_SEARCH_LIMIT
+        elif limit <= 0:
+            raise ValueError(f"Search limit must be a positive number, got {limit}")
+
         # step1: get collection name
-        query_vector = None
         collection_name = self.create_collection_name(knowledge_base_id=str(knowledge_base.id))
 
-        # step2: generate text embedding vector
-        vectors =  self.embedding_client.embed_text(text=query,
-                                                   document_type=DocumentTypeEnum.DOCUMENT.value)
+        normalized_query = WHITESPACE_PATTERN.sub(" ", query).strip()
+        results_cache_key = (collection_name, normalized_query, limit)
+        cached_documents = _search_results_cache.get(results_cache_key)
+        if cached_documents is not None:
+            return cached_documents
 
-        if not vectors or len(vectors) == 0:
-            return None
-        
-        if isinstance(vectors, list) and len(vectors) > 0:
-            query_vector = vectors[0]
+        # A prefetched result list answers any smaller limit for the same query
+        if limit < PREFETCH_LIMIT:
+            prefetched_documents = _search_results_cache.get((collection_name, normalized_query, PREFETCH_LIMIT))
+            if prefetched_documents is not None:
+                return prefetched_documents[:limit]
+
+        fetch_limit = max(limit, PREFETCH_LIMIT) if prefetch else limit
+
+        # step2: generate text embedding vector
+        query_vector = await self.embed_query(normalized_query)
 
         if not query_vector:
-            return False    
+            return None
 
 
         # step3: do semantic search in the vector db and retrieve most similar texts
+        generation = _search_results_generations.get(collection_name, 0)
         retrieved_documents = await self.vectordb_client.search_by_vector(
             collection_name = collection_name,
             vector = query_vector,
-            limit = limit
+            limit = fetch_limit
         )
 
         if not retrieved_documents:
             return None
 
-        return retrieved_documents
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+        if _search_results_generations.get(collection_name, 0) == generation:
+            _search_results_cache.set((collection_name, normalized_query, fetch_limit), retrieved_documents)
+        return retrieved_documents[:limit]
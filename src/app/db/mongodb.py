@@ -9,29 +9,37 @@ from app.logging import get_logger
 logger = get_logger(__name__)
 
 app_settings = get_settings()
-DATABASE_PASSWORD = quote_plus(app_settings.MONGODB_PASSWORD)
-
-# Create a proper connection string with correct authSource
-MONGODB_URL = f"mongodb://{app_settings.MONGODB_USERNAME}:{DATABASE_PASSWORD}@{app_settings.MONGODB_HOST}:{app_settings.MONGODB_PORT}/{app_settings.MONGODB_DATABASE}?authSource={app_settings.MONGODB_DATABASE}"
-
-# Add more detailed connection info logging (without exposing the password)
-safe_url = f"mongodb://{app_settings.MONGODB_USERNAME}:****@{app_settings.MONGODB_HOST}:{app_settings.MONGODB_PORT}/{app_settings.MONGODB_DATABASE}"
-logger.debug(f"MongoDB connection string (redacted): {safe_url}")
 
 db_client: AsyncIOMotorClient = None
+# Handle of the application database, resolved once on connect instead of per request
+database: AsyncIOMotorDatabase = None
 
 
 async def get_database() -> AsyncIOMotorDatabase:
     """
     Returns the database instance.
     Raises HTTPException if the database client is not initialized.
+
+    Kept async although it never awaits: FastAPI runs sync dependencies in its
+    threadpool, while a coroutine dependency is awaited inline on the event loop.
     """
-    if db_client is None:
+    if database is None:
         logger.error("Database client not initialized")
         raise HTTPException(status_code=500, detail="Database connection not available")
-    
-    db_name = app_settings.MONGODB_DATABASE
-    return db_client[db_name]
+
+    return database
+
+
+def build_mongodb_url() -> str:
+    """Build the MongoDB connection string, only needed when actually connecting"""
+    database_password = quote_plus(app_settings.MONGODB_PASSWORD)
+
+    # Add more detailed connection info logging (without exposing the password)
+    safe_url = f"mongodb://{app_settings.MONGODB_USERNAME}:****@{app_settings.MONGODB_HOST}:{app_settings.MONGODB_PORT}/{app_settings.MONGODB_DATABASE}"
+    logger.debug(f"MongoDB connection string (redacted): {safe_url}")
+
+    # Create a proper connection string with correct authSource
+    return f"mongodb://{app_settings.MONGODB_USERNAME}:{database_password}@{app_settings.MONGODB_HOST}:{app_settings.MONGODB_PORT}/{app_settings.MONGODB_DATABASE}?authSource={app_settings.MONGODB_DATABASE}"
 
 
 async def connect_and_init_db():
@@ -39,16 +47,26 @@ async def connect_and_init_db():
     Initializes the database connection with connection pooling.
     - maxPoolSize: Maximum number of connections in the connection pool
     - minPoolSize: Minimum number of connections in the connection pool
+    - maxConnecting: Maximum number of connections being established at once
+    - maxIdleTimeMS: Idle time after which a pooled connection is closed
+    - waitQueueTimeoutMS: How long a request waits for a free connection before failing
+    - serverSelectionTimeoutMS: How long to wait for a reachable server
+    - compressors: Optional wire compression, worthwhile for large chunk fetches over a network
     """
-    global db_client
+    global db_client, database
     try:
         logger.info(f"Connecting to MongoDB at {app_settings.MONGODB_HOST}:{app_settings.MONGODB_PORT}...")
         # Fix: Remove duplicate username/password parameters
         db_client = AsyncIOMotorClient(
-            MONGODB_URL,
+            build_mongodb_url(),
             maxPoolSize=app_settings.MAX_DB_CONN_COUNT,
             minPoolSize=app_settings.MIN_DB_CONN_COUNT,
+            maxConnecting=app_settings.MONGODB_MAX_CONNECTING,
+            maxIdleTimeMS=app_settings.MONGODB_MAX_IDLE_TIME_MS,
+            waitQueueTimeoutMS=app_settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+            serverSelectionTimeoutMS=app_settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
             uuidRepresentation="standard",
+            **({"compressors": app_settings.MONGODB_COMPRESSORS} if app_settings.MONGODB_COMPRESSORS else {}),
         )
         # Verify connection is working by pinging the database we're connecting to
         # instead of the admin database
@@ -61,8 +79,8 @@ async def connect_and_init_db():
         logger.info(f"Connected to MongoDB version: {server_info.get('version', 'unknown')}")
         
         # Log database stats
-        db = db_client[app_settings.MONGODB_DATABASE]
-        stats = await db.command('dbStats')
+        database = db_client[app_settings.MONGODB_DATABASE]
+        stats = await database.command('dbStats')
         logger.info(f"Database stats: {stats.get('collections', 0)} collections, "
                    f"{stats.get('objects', 0)} objects, "
                    f"{stats.get('dataSize', 0) / (1024*1024):.2f} MB data size")
@@ -74,10 +92,11 @@ async def connect_and_init_db():
     
 async def close_db_connection():
     """Closes the database connection if it exists."""
-    global db_client
+    global db_client, database
     if db_client is None:
         logger.warning('No connection to database, nothing to close')
         return
     db_client.close()
     db_client = None
+    database = None
     logger.info('MongoDB connection closed')
\ No newline at end of file
@@ -1,30 +1,36 @@
-from fastapi import Depends, Request
-from motor.motor_asyncio import AsyncIOMotorDatabase
-from app.db.mongodb import get_database
+from fastapi import Request
 from app.models import KnowledgeBaseModel, AssetModel, ChunkModel
 from app.controllers import KnowledgeBaseController, AssetController, NLPController
 
 # Database models
-async def get_knowledge_base_model(db: AsyncIOMotorDatabase = Depends(get_database)):
+# Created once at startup from the request app state, instead of re-initializing the collection per request.
+# Kept async so FastAPI resolves them on the event loop rather than in its threadpool.
+async def get_knowledge_base_model(request: Request) -> KnowledgeBaseModel:
     """Dependency for KnowledgeBaseModel"""
-    return await KnowledgeBaseModel.create_instance(db_client=db)
+    return request.app.knowledge_base_model
 
-async def get_asset_model(db: AsyncIOMotorDatabase = Depends(get_database)):
+async def get_asset_model(request: Request) -> AssetModel:
     """Dependency for AssetModel"""
-    return await AssetModel.create_instance(db_client=db)
+    return request.app.asset_model
 
-async def get_chunk_model(db: AsyncIOMotorDatabase = Depends(get_database)):
+async def get_chunk_model(request: Request) -> ChunkModel:
     """Dependency for ChunkModel"""
-    return await ChunkModel.create_instance(db_client=db)
+    return request.app.chunk_model
 
 # Controllers
+# KnowledgeBaseController holds no per-request state, so one instance is shared by all requests
+knowledge_base_controller = KnowledgeBaseController()
+
 def get_knowledge_base_controller():
     """Dependency for KnowledgeBaseController"""
-    return KnowledgeBaseController()
+    return knowledge_base_controller
+
+# AssetController only holds values derived from the settings, so it is shared the same way
+asset_controller = AssetController()
 
 def get_asset_controller():
     """Dependency for AssetController"""
-    return AssetController()
+    return asset_controller
 
 # NLP Controller
 def get_nlp_controller(request: Request):
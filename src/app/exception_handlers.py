@@ -1,10 +1,54 @@
+import re
 from fastapi import Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from starlette import status
 from app.models.enums.ErrorTypes import ErrorType
 from app.routes.schemas.base import ErrorResponse
 
+# Error types of the status codes whose error type does not depend on the detail message
+STATUS_CODE_ERROR_TYPES = {
+    status.HTTP_400_BAD_REQUEST: ErrorType.INVALID_REQUEST.value,
+    status.HTTP_409_CONFLICT: ErrorType.RESOURCE_CONFLICT.value,
+    status.HTTP_413_REQUEST_ENTITY_TOO_LARGE: ErrorType.FILE_SIZE_EXCEEDED.value,
+    status.HTTP_415_UNSUPPORTED_MEDIA_TYPE: ErrorType.FILE_TYPE_NOT_SUPPORTED.value,
+    status.HTTP_422_UNPROCESSABLE_ENTITY: ErrorType.VALIDATION_ERROR.value,
+    status.HTTP_503_SERVICE_UNAVAILABLE: ErrorType.SERVICE_UNAVAILABLE.value,
+}
+
+# Keyword -> error type for the detail message, in priority order: the first listed keyword found wins
+NOT_FOUND_ERROR_TYPES = (
+    ("knowledge base", ErrorType.KNOWLEDGE_BASE_NOT_FOUND.value),
+    ("asset", ErrorType.ASSET_NOT_FOUND.value),
+    ("file", ErrorType.FILE_NOT_FOUND.value),
+)
+SERVER_ERROR_TYPES = (
+    ("process", ErrorType.PROCESSING_FAILED.value),
+    ("index", ErrorType.VECTOR_DB_ERROR.value),
+    ("vector", ErrorType.VECTOR_DB_ERROR.value),
+    ("search", ErrorType.VECTOR_DB_SEARCH_ERROR.value),
+)
+
+
+def compile_keyword_pattern(keyword_error_types: tuple) -> re.Pattern:
+    """Compile the keywords into one case-insensitive alternation, so a detail message is scanned once"""
+    return re.compile("|".join(re.escape(keyword) for keyword, _ in keyword_error_types), re.IGNORECASE)
+
+
+NOT_FOUND_KEYWORD_PATTERN = compile_keyword_pattern(NOT_FOUND_ERROR_TYPES)
+SERVER_ERROR_KEYWORD_PATTERN = compile_keyword_pattern(SERVER_ERROR_TYPES)
+
+
+def match_detail_error_type(detail: str, keyword_pattern: re.Pattern, keyword_error_types: tuple, default_error_type: str) -> str:
+    """Get the error type of the highest priority keyword found in the detail message, or the default"""
+    found_keywords = {match.lower() for match in keyword_pattern.findall(detail)}
+    if found_keywords:
+        for keyword, error_type in keyword_error_types:
+            if keyword in found_keywords:
+                return error_type
+    return default_error_type
+
+
 async def http_exception_handler(request: Request, exc: HTTPException):
     """
     Custom exception handler that formats HTTPExceptions to include error type.
@@ -25,45 +69,16 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         # Default to mapping based on status code and detail string
         detail = str(exc.detail)
 
-        # Default to invalid request
-        error_type = ErrorType.INVALID_REQUEST.value
-
         # Map status codes to error types
-        if exc.status_code == status.HTTP_400_BAD_REQUEST:
-            error_type = ErrorType.INVALID_REQUEST.value
-        elif exc.status_code == status.HTTP_404_NOT_FOUND:
+        if exc.status_code == status.HTTP_404_NOT_FOUND:
             # Check what type of resource is not found based on the detail message
-            detail_lower = detail.lower()
-            if "knowledge base" in detail_lower:
-                error_type = ErrorType.KNOWLEDGE_BASE_NOT_FOUND.value
-            elif "asset" in detail_lower:
-                error_type = ErrorType.ASSET_NOT_FOUND.value
-            elif "file" in detail_lower:
-                error_type = ErrorType.FILE_NOT_FOUND.value
-            else:
-                # Default for 404 errors
-                error_type = ErrorType.INVALID_REQUEST.value
-        elif exc.status_code == status.HTTP_409_CONFLICT:
-            error_type = ErrorType.RESOURCE_CONFLICT.value
-        elif exc.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE:
-            error_type = ErrorType.FILE_SIZE_EXCEEDED.value
-        elif exc.status_code == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE:
-            error_type = ErrorType.FILE_TYPE_NOT_SUPPORTED.value
-        elif exc.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY:
-            error_type = ErrorType.VALIDATION_ERROR.value
+            error_type = match_detail_error_type(detail, NOT_FOUND_KEYWORD_PATTERN, NOT_FOUND_ERROR_TYPES, ErrorType.INVALID_REQUEST.value)
         elif exc.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR:
             # Check for processing errors
-            detail_lower = detail.lower()
-            if "process" in detail_lower:
-                error_type = ErrorType.PROCESSING_FAILED.value
-            elif "index" in detail_lower or "vector" in detail_lower:
-                error_type = ErrorType.VECTOR_DB_ERROR.value
-            elif "search" in detail_lower:
-                error_type = ErrorType.VECTOR_DB_SEARCH_ERROR.value
-            else:
-                error_type = ErrorType.DATABASE_ERROR.value
-        elif exc.status_code == status.HTTP_503_SERVICE_UNAVAILABLE:
-            error_type = ErrorType.SERVICE_UNAVAILABLE.value
+            error_type = match_detail_error_type(detail, SERVER_ERROR_KEYWORD_PATTERN, SERVER_ERROR_TYPES, ErrorType.DATABASE_ERROR.value)
+        else:
+            # Default to invalid request
+            error_type = STATUS_CODE_ERROR_TYPES.get(exc.status_code, ErrorType.INVALID_REQUEST.value)
 
     # Use the ErrorResponse schema for consistent error formatting
     error_response = ErrorResponse(
@@ -72,7 +87,7 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         errors=None
     )
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content=error_response.model_dump()
     )
@@ -102,7 +117,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
         errors=error_messages
     )
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content=error_response.model_dump()
     )
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import lru_cache
 import os
 from typing import Optional
 
@@ -18,6 +19,7 @@ class Settings(BaseSettings):
     FILE_ALLOWED_TYPES: list[str]
     FILE_MAX_SIZE: int
     FILE_DEFAULT_CHUNK_SIZE: int
+    FILE_PROCESSING_WORKERS: int = 2
     
     # MongoDB Config
     MONGODB_HOST: str
@@ -27,6 +29,11 @@ class Settings(BaseSettings):
     MONGODB_DATABASE: str
     MAX_DB_CONN_COUNT: int
     MIN_DB_CONN_COUNT: int
+    MONGODB_MAX_CONNECTING: int = 4
+    MONGODB_MAX_IDLE_TIME_MS: int = 60000
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: int = 5000
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+    MONGODB_COMPRESSORS: Optional[str] = None
     
     
     # LLM Providers Config
@@ -61,7 +68,9 @@ class Settings(BaseSettings):
     
     
     
+@lru_cache(maxsize=1)
 def get_settings():
+    # Parsed from the environment and .env once, every caller shares the same Settings instance
     return Settings()
     
 
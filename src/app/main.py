@@ -1,13 +1,18 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
+import asyncio
 from app.routes.base import base_router
 from app.routes.assets import asset_router
 from app.routes.knowledge_bases import knowledge_base_router
 from app.routes.nlp import nlp_router
 
 from app.helpers.config import get_settings, init_database_dir, init_files_dir
-from app.db.mongodb import connect_and_init_db, close_db_connection
+from app.db.mongodb import connect_and_init_db, close_db_connection, get_database
+from app.models import KnowledgeBaseModel, AssetModel, ChunkModel
+from app.controllers import KnowledgeBaseController
+from app.controllers.AssetController import shutdown_file_processing_pool
 
 from app.logging import setup_logging, get_logger
 import logging
@@ -41,6 +46,20 @@ async def lifespan(app: FastAPI):
         module_logger.info("Initializing database connection...")
         await connect_and_init_db()
 
+        # Startup: Create the database models once, they are shared by all requests
+        database = await get_database()
+        app.knowledge_base_model = await KnowledgeBaseModel.create_instance(db_client=database)
+        app.asset_model = await AssetModel.create_instance(db_client=database)
+        app.chunk_model = await ChunkModel.create_instance(db_client=database)
+
+        # Startup: Create the directories of existing knowledge bases before serving requests
+        try:
+            knowledge_base_ids = await app.knowledge_base_model.get_all_knowledge_base_ids()
+            await asyncio.to_thread(KnowledgeBaseController().warmup_knowledge_base_dirs, knowledge_base_ids)
+        except Exception as e:
+            # Directories are still created lazily on first use, so this is not fatal
+            module_logger.warning(f"Failed to prepare knowledge base directories: {e}")
+
         # initialize providers
         llm_provider_factory = LLMProviderFactory(config = app_settings)
         vectordb_provider_factory = VectorDBProviderFactory(config = app_settings)
@@ -77,6 +96,7 @@ async def lifespan(app: FastAPI):
         try:
             module_logger.info("Shutting down database connection...")
             await close_db_connection()
+            shutdown_file_processing_pool()
             module_logger.info("Application shutdown complete")
         except Exception as e:
             module_logger.error(f"Error during shutdown: {str(e)}", exc_info=True)
@@ -88,6 +108,7 @@ app = FastAPI(
     title=app_settings.APP_NAME,
     description="API for the Bridge-X-RAG application",
     version=app_settings.APP_VERSION,
+    default_response_class=ORJSONResponse,
 )
 
 
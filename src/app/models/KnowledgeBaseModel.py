@@ -101,6 +101,18 @@ class KnowledgeBaseModel(BaseDataModel[KnowledgeBase]):
             logger.error(f"Error getting all knowledge bases: {e}")
             return [], 0, 0
 
+    async def get_all_knowledge_base_ids(self) -> List[str]:
+        """Get the IDs of all knowledge bases, fetching only the _id field
+
+        Returns:
+            List of knowledge base IDs as strings
+        """
+        try:
+            return [str(document["_id"]) async for document in self.collection.find({}, {"_id": 1})]
+        except Exception as e:
+            logger.error(f"Error getting knowledge base IDs: {e}")
+            return []
+
 
     async def update_knowledge_base_data(self, knowledge_base_id, update_data: Dict[str, Any]) -> Tuple[bool, Optional[KnowledgeBase]]:
         """Update a knowledge base's data in MongoDB
@@ -210,8 +210,8 @@ class AssetService:
             # Get knowledge base directory
             knowledge_base_dir_path = self.knowledge_base_controller.get_knowledge_base_path(knowledge_base_id=knowledge_base_id)
 
-            # Generate unique file path
-            file_path, file_name = self.asset_controller.generate_unique_filepath(
+            # Atomically create a uniquely named file
+            file_fd, file_path, file_name = self.asset_controller.create_unique_file(
                 project_path=knowledge_base_dir_path,
                 original_file_name=file.filename
             )
@@ -220,7 +220,8 @@ class AssetService:
             save_success = await self.asset_controller.save_uploaded_file(
                 file=file,
                 file_path=file_path,
-                chunk_size=chunk_size
+                chunk_size=chunk_size,
+                file_fd=file_fd
             )
 
             if not save_success:
@@ -441,24 +442,18 @@ class AssetService:
             logger.error(error_msg)
             raise_processing_failed(error_msg)
 
-        # Get file content
-        file_content = self.asset_controller.get_file_content(
+        # Load the file and split it into chunks in a worker process
+        content_loaded, file_chunks = await self.asset_controller.load_and_split_file_in_pool(
             file_name=asset.asset_name,
-            file_path=file_path
+            file_path=file_path,
+            chunk_size=chunk_size,
+            overlap_size=overlap_size
         )
-        if file_content is None:
+        if not content_loaded:
             error_msg = f"Failed to get content for file: {asset.asset_name}"
             logger.error(error_msg)
             raise_processing_failed(error_msg)
 
-        # Process file content into chunks
-        file_chunks = self.asset_controller.process_file_content(
-            file_content=file_content,
-            file_name=asset.asset_name,
-            chunk_size=chunk_size,
-            overlap_size=overlap_size
-        )
-
         if file_chunks is None or len(file_chunks) == 0:
             error_msg = f"Failed to process file content: {asset.asset_name}"
             logger.error(error_msg)
@@ -225,7 +225,7 @@ class KnowledgeBaseService:
             )
 
         # Update knowledge base resources in vector database and file system
-        resources_updated = await self.knowledge_base_controller.update_knowledge_base_resources(
+        resources_updated = self.knowledge_base_controller.update_knowledge_base_resources(
             knowledge_base=updated_knowledge_base,
             new_knowledge_base_name=knowledge_base_name,
             nlp_controller=self.nlp_controller
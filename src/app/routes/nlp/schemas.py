@@ -17,7 +17,7 @@ class AssetIndexRequest(BaseModel):
 class SearchRequest(BaseModel):
     """Request model for searching in vector database"""
     query: str = Field(..., description="Search query")
-    limit: Optional[int] = Field(5, description="Maximum number of results to return")
+    limit: Optional[int] = Field(5, gt=0, description="Maximum number of results to return")
 
 class ChatRequest(BaseModel):
     """Request model for chat with RAG"""
@@ -386,7 +386,8 @@ class NLPService:
             results = await self.nlp_controller.search_vector_db(
                 knowledge_base=knowledge_base,
                 query=query,
-                limit=limit
+                limit=limit,
+                prefetch=True
             )
 
             if not results:
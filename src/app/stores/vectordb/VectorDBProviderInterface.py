@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
 
 
 class VectorDBProviderInterface(ABC):
@@ -113,7 +113,7 @@ class VectorDBProviderInterface(ABC):
         self,
         collection_name: str,
         filter_dicts: List[Dict[str, Any]]
-    ) -> Dict[str, List]:
+    ) -> Dict[Tuple, List]:
         """Search for records in a collection based on multiple metadata filters
 
         This is more efficient than calling search_by_metadata multiple times when checking
@@ -124,7 +124,8 @@ class VectorDBProviderInterface(ABC):
             filter_dicts: List of dictionaries, each containing metadata key-value pairs to filter by
 
         Returns:
-            Dict: Dictionary mapping filter keys to lists of matching records
+            Dict: Dictionary mapping filter keys to lists of matching records.
+                  A filter key is the tuple of the filter's (key, value) pairs sorted by key
         """
         pass
 
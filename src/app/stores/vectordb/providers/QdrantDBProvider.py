@@ -11,7 +11,7 @@ from app.stores.vectordb.VectorDBProviderInterface import VectorDBProviderInterf
 from app.stores.vectordb.VectorDBEnums import DistanceMethodEnum
 from app.logging import get_logger
 # from logging import getLogger
-from typing import Optional, List, Union, Dict, Any
+from typing import Optional, List, Union, Dict, Any, Tuple
 
 
 class QdrantDBProvider(VectorDBProviderInterface):
@@ -616,7 +616,7 @@ class QdrantDBProvider(VectorDBProviderInterface):
             self.logger.error(f"Error searching by metadata in collection '{collection_name}': {e}", exc_info=True)
             return None
 
-    async def batch_search_by_metadata(self, collection_name: str, filter_dicts: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    async def batch_search_by_metadata(self, collection_name: str, filter_dicts: List[Dict[str, Any]]) -> Dict[Tuple, List[Dict[str, Any]]]:
         """Search for records in a collection based on multiple metadata filters
 
         This is more efficient than calling search_by_metadata multiple times when checking
@@ -628,7 +628,7 @@ class QdrantDBProvider(VectorDBProviderInterface):
 
         Returns:
             Dict: Dictionary mapping filter keys to lists of matching records
-                  Keys are generated by concatenating the filter values
+                  Keys are tuples of the filter's (key, value) pairs sorted by key
         """
         await self._check_connection()
 
@@ -650,7 +650,7 @@ class QdrantDBProvider(VectorDBProviderInterface):
 
                 for filter_dict in batch:
                     # Create a key for this filter
-                    filter_key = "_".join([f"{k}:{v}" for k, v in sorted(filter_dict.items())])
+                    filter_key = tuple(sorted(filter_dict.items()))
 
                     # Build filter conditions
                     filter_conditions = []